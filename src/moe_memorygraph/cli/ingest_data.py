@@ -8,6 +8,7 @@ sys.path.append(os.getcwd())
 from src.moe_memorygraph.db.session import async_session_factory
 from src.moe_memorygraph.db.models import VectorMemory, SemanticFact
 from src.moe_memorygraph.core.embedding import embed_text
+from src.moe_memorygraph.db.indexes import analyze
 
 async def ingest():
     print("🧠 Starting Hybrid Ingestion (Vector + Semantic)...")
@@ -56,6 +57,9 @@ async def ingest():
         
         # Commit all changes
         await session.commit()
+
+    # Refresh planner statistics for the freshly loaded rows
+    await analyze()
         
     print("✅ Ingestion Complete! The brain now contains knowledge.")
 
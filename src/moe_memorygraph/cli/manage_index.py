@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import sys
+import os
+
+# Fix path to ensure imports work regardless of how this is run
+sys.path.append(os.getcwd())
+
+from src.moe_memorygraph.core.config import settings
+from src.moe_memorygraph.db import indexes
+
+# Typical workflow:
+#   1. cli/reset_db.py          -> tables only, no HNSW index
+#   2. ingestion / ingest_data  -> bulk load (fast: no live graph to update)
+#   3. cli/manage_index.py build  -> HNSW + metadata GIN index
+#   Later: cli/manage_index.py rebuild --m 32 --ef-construction 128
+
+async def print_status(quantization: str):
+    status = await indexes.index_status(quantization)
+    if status is None:
+        print(f"❌ No HNSW index for quantization '{quantization}'. Run 'build' first.")
+    else:
+        print(f"📊 Index:   {status['name']}")
+        print(f"   Size:    {status['size']} ({status['size_bytes']} bytes)")
+        print(f"   Options: {', '.join(status['options'] or [])}")
+        print(f"   Valid:   {status['valid']}")
+
+    gin = await indexes.metadata_index_status()
+    if gin is None:
+        print(f"❌ No metadata GIN index ({indexes.METADATA_INDEX}).")
+    else:
+        print(f"📊 Index:   {gin['name']} | {gin['size']} | valid={gin['valid']}")
+
+def print_build_report(report: dict):
+    estimated_mb = report["estimated_graph_bytes"] / (1024 * 1024)
+    print(f"   Estimated graph:      {estimated_mb:.0f} MB")
+    print(f"   maintenance_work_mem: {report['maintenance_work_mem']}")
+    print(f"   Parallel workers:     {report['workers']}")
+    if report["workers"] != settings.INDEX_PARALLEL_WORKERS:
+        print("   ⚠️  Parallel build ran out of shared memory; rebuilt without workers. "
+              "Raise shm_size (docker-compose.yml) or lower maintenance_work_mem.")
+    if report["maintenance_work_mem_bytes"] < report["estimated_graph_bytes"]:
+        print("   ⚠️  maintenance_work_mem is BELOW the estimated graph: the build used the "
+              "slow on-disk phase. Raise INDEX_MAINTENANCE_WORK_MEM(_MAX_MB) if RAM allows.")
+    else:
+        print("   ✅ The estimated graph fits in maintenance_work_mem.")
+
+async def run(args):
+    quantization = args.quantization
+
+    if args.command == "build":
+        print(f"🏗️  Building HNSW index ({quantization}) | "
+              f"workers={settings.INDEX_PARALLEL_WORKERS}...")
+        report = await indexes.build_index(
+            quantization, args.m, args.ef_construction, concurrently=args.concurrently
+        )
+        if report["status"] == "exists":
+            print("ℹ️  A valid index already exists. Use 'rebuild' to change its parameters.")
+        else:
+            print(f"✅ Built in {report['seconds']:.1f}s")
+            print_build_report(report)
+
+        print("🏗️  Building metadata GIN index...")
+        gin = await indexes.build_metadata_index(concurrently=args.concurrently)
+        if gin["status"] == "exists":
+            print("ℹ️  A valid metadata index already exists.")
+        else:
+            print(f"✅ Built in {gin['seconds']:.1f}s")
+        await print_status(quantization)
+
+    elif args.command == "rebuild":
+        print(f"♻️  Rebuilding HNSW index ({quantization}) CONCURRENTLY...")
+        report = await indexes.rebuild_index(quantization, args.m, args.ef_construction)
+        print(f"✅ Rebuilt in {report['seconds']:.1f}s (no downtime)")
+        print_build_report(report)
+        await print_status(quantization)
+
+    elif args.command == "drop":
+        print(f"🔥 Dropping HNSW index ({quantization})...")
+        await indexes.drop_index(quantization)
+        print("✅ Dropped. Re-run 'build' after loading data.")
+
+    elif args.command == "analyze":
+        print("🔍 Running ANALYZE...")
+        await indexes.analyze()
+        print("✅ Planner statistics refreshed.")
+
+    elif args.command == "migrate-metadata":
+        print("🔧 Converting metadata to JSONB + building GIN index...")
+        await indexes.migrate_metadata_to_jsonb()
+        print("✅ Metadata is JSONB and GIN-indexed.")
+
+    elif args.command == "status":
+        await print_status(quantization)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the HNSW vector index without dropping the database.")
+    parser.add_argument("command", choices=["build", "rebuild", "drop", "analyze", "status", "migrate-metadata"])
+    parser.add_argument("--quantization", choices=["none", "halfvec", "binary"], default=settings.VECTOR_QUANTIZATION)
+    parser.add_argument("--m", type=int, default=None, help=f"HNSW m (default {settings.HNSW_M})")
+    parser.add_argument("--ef-construction", type=int, default=None,
+                        help=f"HNSW ef_construction (default {settings.HNSW_EF_CONSTRUCTION})")
+    parser.add_argument("--concurrently", action="store_true",
+                        help="Build without blocking writes (slower, for live tables)")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
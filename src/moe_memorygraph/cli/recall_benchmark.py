@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+# Fix path to ensure imports work regardless of how this is run
+sys.path.append(os.getcwd())
+
+from sqlalchemy import select, func, text
+from src.moe_memorygraph.core.config import settings
+from src.moe_memorygraph.db.session import async_session_factory
+from src.moe_memorygraph.db.models import VectorMemory
+from src.moe_memorygraph.db import indexes
+from src.moe_memorygraph.experts.vector import search_by_embedding
+
+async def exact_neighbours(query_vector: list[float], query_id: str, limit: int, tenant_id: str) -> set[str]:
+    """
+    Ground truth: brute-force cosine search with the HNSW index disabled.
+    The query row itself is excluded (it is always its own exact top-1).
+    """
+    distance = VectorMemory.embedding.cosine_distance(query_vector)
+    async with async_session_factory() as session:
+        await session.execute(text("SET LOCAL enable_indexscan = off"))
+        stmt = select(VectorMemory.id).filter(
+            VectorMemory.tenant_id == tenant_id,
+            VectorMemory.id != query_id
+        ).order_by(distance).limit(limit)
+        result = await session.execute(stmt)
+        return {str(row_id) for row_id in result.scalars().all()}
+
+async def run_benchmark(tenant_id: str, quantization: str, num_queries: int, limit: int, factors: list[int]):
+    print(f"📏 Recall benchmark | quantization={quantization} | "
+          f"tenant={tenant_id} | queries={num_queries} | k={limit}")
+
+    # 0. Without the index, the "approximate" stage is an exact sequential
+    #    scan and recall would misleadingly come out at ~1.0.
+    status = await indexes.index_status(quantization)
+    if status is None or not status["valid"]:
+        print(f"❌ No valid HNSW index for '{quantization}'. "
+              f"Run: python -m src.moe_memorygraph.cli.manage_index build --quantization {quantization}")
+        return
+    print(f"📊 Index {status['name']}: {status['size']} ({status['size_bytes']} bytes)")
+
+    # Memory saving vs. the full-precision index, when both exist
+    size_ratio = None
+    if quantization != "none":
+        full = await indexes.index_status("none")
+        if full is not None and full["valid"] and status["size_bytes"]:
+            size_ratio = full["size_bytes"] / status["size_bytes"]
+            print(f"📉 vs {full['name']} ({full['size']}): {size_ratio:.1f}x smaller")
+        else:
+            print("ℹ️  Build the 'none' index too to measure the size ratio.")
+
+    # 1. Sample stored rows to use as queries
+    async with async_session_factory() as session:
+        stmt = select(VectorMemory.id, VectorMemory.embedding).filter(
+            VectorMemory.tenant_id == tenant_id
+        ).order_by(func.random()).limit(num_queries)
+        queries = [(str(row_id), list(v)) for row_id, v in (await session.execute(stmt)).all()]
+
+    if not queries:
+        print("❌ No vectors found for this tenant! Ingest data first.")
+        return
+
+    # 2. Ground truth from the exact search
+    truth = [await exact_neighbours(q, query_id, limit, tenant_id) for query_id, q in queries]
+
+    # 3. Recall@k and latency for each over-fetch factor
+    print("---------------------------------------------------------")
+    ratio_column = f"{size_ratio:.1f}x" if size_ratio else "n/a"
+    print(f"{'factor':>8} | {'recall@' + str(limit):>10} | {'avg ms':>8} | {'size ratio':>10}")
+    for factor in factors:
+        hits = 0
+        elapsed = 0.0
+        for (query_id, q), expected in zip(queries, truth):
+            start = time.perf_counter()
+            # Ask for one extra row so dropping the query row still leaves k
+            results = await search_by_embedding(
+                q, limit=limit + 1, tenant_id=tenant_id,
+                quantization=quantization, rerank_factor=factor
+            )
+            elapsed += time.perf_counter() - start
+            found = [r["id"] for r in results if r["id"] != query_id][:limit]
+            hits += len(expected & set(found))
+
+        recall = hits / max(sum(len(t) for t in truth), 1)
+        print(f"{factor:>8} | {recall:>10.3f} | {elapsed / len(queries) * 1000:>8.1f} | {ratio_column:>10}")
+    print("---------------------------------------------------------")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure recall of a vector index against exact search.")
+    parser.add_argument("--quantization", choices=["none", "halfvec", "binary"], default=settings.VECTOR_QUANTIZATION)
+    parser.add_argument("--tenant", default="demo_user")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--factors", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.tenant, args.quantization, args.queries, args.k, args.factors))
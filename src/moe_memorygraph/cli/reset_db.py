@@ -11,11 +11,12 @@ async def reset_db():
         print("🔥 Dropping old tables...")
         await conn.run_sync(Base.metadata.drop_all)
         
-        # 2. Create the new tables (With HNSW Index)
-        print("✨ Creating new tables (Vector + Semantic + HNSW Index)...")
+        # 2. Create the new tables (HNSW Index is deferred until after ingestion)
+        print("✨ Creating new tables (Vector + Semantic)...")
         await conn.run_sync(Base.metadata.create_all)
         
     print("✅ Database Reset Complete. You can now ingest data.")
+    print("👉 Then build the vector index: python -m src.moe_memorygraph.cli.manage_index build")
 
 if __name__ == "__main__":
     asyncio.run(reset_db())
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -20,6 +21,28 @@ class Settings(BaseSettings):
     # Vector Settings
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
 
+    # Quantized Index Settings
+    # "none"    -> HNSW over the full-precision vector (4 bytes/dim)
+    # "halfvec" -> HNSW over embedding::halfvec (2 bytes/dim, ~2x smaller)
+    # "binary"  -> HNSW over binary_quantize(embedding) (1 bit/dim, ~32x smaller)
+    # Quantized searches over-fetch (limit * VECTOR_RERANK_FACTOR) candidates
+    # from the compact index, then rerank them by exact cosine distance.
+    VECTOR_QUANTIZATION: Literal["none", "halfvec", "binary"] = "none"
+    VECTOR_RERANK_FACTOR: int = 4
+
+    # HNSW Build Settings (used by cli/manage_index.py)
+    HNSW_M: int = 16
+    HNSW_EF_CONSTRUCTION: int = 64
+    # Session settings for the build: the graph should fit in memory,
+    # otherwise the build falls back to a much slower on-disk phase.
+    # None -> sized from the estimated graph (rows x vector size x m),
+    # capped at INDEX_MAX_MAINTENANCE_WORK_MEM_MB. A parallel build places
+    # the graph in shared memory, so the cap must fit the server's RAM and
+    # /dev/shm (see shm_size in docker-compose.yml).
+    INDEX_MAINTENANCE_WORK_MEM: Optional[str] = None
+    INDEX_MAX_MAINTENANCE_WORK_MEM_MB: int = 512
+    INDEX_PARALLEL_WORKERS: int = 4
+
     # Load from .env file if available
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
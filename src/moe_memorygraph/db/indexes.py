@@ -0,0 +1,313 @@
+import math
+import time
+from typing import Any, Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncConnection
+from src.moe_memorygraph.core.config import settings
+from src.moe_memorygraph.db.session import engine
+from src.moe_memorygraph.db.models import VectorMemory, EMBEDDING_DIM, HNSW_INDEXES
+
+TABLE = VectorMemory.__tablename__
+
+# GIN index for metadata containment filters (metadata @> '{"category": "REFUND"}').
+# jsonb_path_ops only supports @>, but is smaller and faster than the default opclass.
+METADATA_INDEX = "ix_vector_memory_metadata"
+
+# Online index lifecycle for the HNSW and metadata indexes.
+# 'CREATE/DROP INDEX CONCURRENTLY' cannot run inside a transaction block,
+# so every helper here runs on an AUTOCOMMIT connection.
+
+async def _autocommit_connection() -> AsyncConnection:
+    conn = await engine.connect()
+    return await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+# Rough in-memory footprint of one HNSW element besides its vector:
+# ~2*m level-0 neighbour slots of ~16 bytes each, plus element overhead.
+NEIGHBOUR_BYTES = 16
+ELEMENT_OVERHEAD_BYTES = 128
+MIN_WORK_MEM_MB = 64
+
+def _vector_bytes(quantization: str) -> int:
+    """Stored size of one indexed value (pgvector adds an 8-byte header)."""
+    if quantization == "halfvec":
+        return 2 * EMBEDDING_DIM + 8
+    if quantization == "binary":
+        return EMBEDDING_DIM // 8 + 8
+    return 4 * EMBEDDING_DIM + 8
+
+async def estimate_graph_bytes(conn: AsyncConnection, quantization: str, m: int) -> int:
+    """
+    Estimated size of the in-memory HNSW graph: rows x (vector + 2*m neighbours).
+    Uses the planner's row estimate, so run ANALYZE first.
+    """
+    result = await conn.execute(text(
+        "SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE relname = :table"
+    ), {"table": TABLE})
+    rows = result.scalar() or 0
+    per_row = _vector_bytes(quantization) + 2 * m * NEIGHBOUR_BYTES + ELEMENT_OVERHEAD_BYTES
+    return rows * per_row
+
+def _sized_work_mem(estimated_bytes: int) -> str:
+    """
+    The configured override, or the estimate plus 25% headroom, capped at
+    INDEX_MAX_MAINTENANCE_WORK_MEM_MB.
+    """
+    if settings.INDEX_MAINTENANCE_WORK_MEM:
+        return settings.INDEX_MAINTENANCE_WORK_MEM
+    mb = math.ceil(estimated_bytes * 1.25 / (1024 * 1024))
+    mb = min(max(mb, MIN_WORK_MEM_MB), settings.INDEX_MAX_MAINTENANCE_WORK_MEM_MB)
+    return f"{mb}MB"
+
+def _is_shared_memory_error(exc: DBAPIError) -> bool:
+    """A parallel build whose maintenance_work_mem does not fit in /dev/shm."""
+    return "shared memory" in str(exc.orig).lower()
+
+async def _configure_build(conn: AsyncConnection, maintenance_work_mem: Optional[str],
+                           workers: Optional[int] = None):
+    """
+    Session settings for a fast build: enough memory to keep the whole graph
+    in RAM, and parallel workers to share the insertion work.
+    These are session-level (CONCURRENTLY forbids a transaction, so SET LOCAL
+    is not an option): always pair with _reset_build before the connection
+    goes back to the pool.
+    """
+    if maintenance_work_mem:
+        await conn.execute(text(f"SET maintenance_work_mem = '{maintenance_work_mem}'"))
+    if workers is None:
+        workers = settings.INDEX_PARALLEL_WORKERS
+    await conn.execute(text(f"SET max_parallel_maintenance_workers = {int(workers)}"))
+
+async def _reset_build(conn: AsyncConnection):
+    """Undo _configure_build so the pooled connection does not keep the settings."""
+    await conn.execute(text("RESET maintenance_work_mem"))
+    await conn.execute(text("RESET max_parallel_maintenance_workers"))
+
+def _index_expression(quantization: str) -> str:
+    """Compiles the indexed expression, e.g. 'CAST(embedding AS HALFVEC(384))'."""
+    dialect = postgresql.dialect()
+    compiler = dialect.statement_compiler(dialect, None)
+    return compiler.process(HNSW_INDEXES[quantization][1](), include_table=False, literal_binds=True)
+
+def _create_index_sql(name: str, quantization: str, m: int, ef_construction: int, concurrently: bool) -> str:
+    _, _, opclass = HNSW_INDEXES[quantization]
+    expression = f"({_index_expression(quantization)})"
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}{name} "
+        f"ON {TABLE} USING hnsw ({expression} {opclass}) "
+        f"WITH (m = {int(m)}, ef_construction = {int(ef_construction)})"
+    )
+
+async def _build(conn: AsyncConnection, name: str, quantization: str, m: int, ef_construction: int,
+                 concurrently: bool) -> Dict[str, Any]:
+    """
+    ANALYZE, size maintenance_work_mem, build, and report timings.
+    If the parallel build cannot get its shared memory segment, it is
+    retried once without parallel workers.
+    """
+    await conn.execute(text(f"ANALYZE {TABLE}"))
+    estimated = await estimate_graph_bytes(conn, quantization, m)
+    work_mem = _sized_work_mem(estimated)
+    workers = settings.INDEX_PARALLEL_WORKERS
+    sql = _create_index_sql(name, quantization, m, ef_construction, concurrently)
+
+    await _configure_build(conn, work_mem, workers)
+    try:
+        # Let Postgres parse the setting, so the report compares real bytes
+        result = await conn.execute(text("SELECT pg_size_bytes(current_setting('maintenance_work_mem'))"))
+        work_mem_bytes = result.scalar()
+
+        start = time.perf_counter()
+        try:
+            await conn.execute(text(sql))
+        except DBAPIError as exc:
+            if workers == 0 or not _is_shared_memory_error(exc):
+                raise
+            # A failed CONCURRENTLY build leaves an INVALID index behind
+            await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            workers = 0
+            await _configure_build(conn, work_mem, workers)
+            start = time.perf_counter()
+            await conn.execute(text(sql))
+        seconds = time.perf_counter() - start
+    finally:
+        await _reset_build(conn)
+    return {
+        "seconds": seconds,
+        "estimated_graph_bytes": estimated,
+        "maintenance_work_mem": work_mem,
+        "maintenance_work_mem_bytes": work_mem_bytes,
+        "workers": workers,
+    }
+
+async def analyze():
+    """Refresh planner statistics after a bulk load."""
+    conn = await _autocommit_connection()
+    try:
+        await conn.execute(text(f"ANALYZE {TABLE}"))
+    finally:
+        await conn.close()
+
+async def index_status(quantization: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Size, build parameters and validity of the HNSW index, or None if missing.
+    An invalid index is the leftover of a failed CONCURRENTLY build.
+    """
+    return await _index_info(HNSW_INDEXES[quantization or settings.VECTOR_QUANTIZATION][0])
+
+async def metadata_index_status() -> Optional[Dict[str, Any]]:
+    """Same as index_status, for the metadata GIN index."""
+    return await _index_info(METADATA_INDEX)
+
+async def _index_info(name: str) -> Optional[Dict[str, Any]]:
+    conn = await _autocommit_connection()
+    try:
+        result = await conn.execute(text("""
+            SELECT pg_relation_size(c.oid) AS size_bytes,
+                   pg_size_pretty(pg_relation_size(c.oid)) AS size,
+                   c.reloptions AS options,
+                   i.indisvalid AS valid
+            FROM pg_class c
+            JOIN pg_index i ON i.indexrelid = c.oid
+            WHERE c.relname = :name
+        """), {"name": name})
+        row = result.mappings().first()
+    finally:
+        await conn.close()
+
+    if row is None:
+        return None
+    return {"name": name, **row}
+
+async def build_index(
+    quantization: Optional[str] = None,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+    concurrently: bool = False,
+) -> Dict[str, Any]:
+    """
+    Builds the HNSW index over the already-loaded table.
+    Run this AFTER bulk ingestion.
+
+    A valid existing index is left alone ("exists"; use rebuild_index to
+    change it). An INVALID leftover of a failed CONCURRENTLY build is dropped
+    first. Returns {"status", "seconds", "estimated_graph_bytes",
+    "maintenance_work_mem", "maintenance_work_mem_bytes", "workers"}.
+    """
+    quantization = quantization or settings.VECTOR_QUANTIZATION
+    name = HNSW_INDEXES[quantization][0]
+
+    status = await index_status(quantization)
+    if status is not None and status["valid"]:
+        return {"status": "exists"}
+
+    conn = await _autocommit_connection()
+    try:
+        if status is not None:
+            await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+        report = await _build(
+            conn, name, quantization,
+            m or settings.HNSW_M,
+            ef_construction or settings.HNSW_EF_CONSTRUCTION,
+            concurrently,
+        )
+        return {"status": "built", **report}
+    finally:
+        await conn.close()
+
+async def rebuild_index(
+    quantization: Optional[str] = None,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Zero-downtime rebuild with (possibly) new parameters.
+
+    REINDEX CONCURRENTLY cannot change m/ef_construction, so we build a new
+    index CONCURRENTLY next to the old one, drop the old one CONCURRENTLY and
+    rename the new one into place. Queries keep using an index throughout.
+    Returns the same report as build_index.
+    """
+    quantization = quantization or settings.VECTOR_QUANTIZATION
+    name = HNSW_INDEXES[quantization][0]
+    new_name = f"{name}_new"
+    conn = await _autocommit_connection()
+    try:
+        # Clean up an invalid leftover from a previously failed rebuild
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {new_name}"))
+
+        report = await _build(
+            conn, new_name, quantization,
+            m or settings.HNSW_M,
+            ef_construction or settings.HNSW_EF_CONSTRUCTION,
+            concurrently=True,
+        )
+
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        await conn.execute(text(f"ALTER INDEX {new_name} RENAME TO {name}"))
+        return {"status": "rebuilt", **report}
+    finally:
+        await conn.close()
+
+async def build_metadata_index(concurrently: bool = False) -> Dict[str, Any]:
+    """
+    Builds the metadata GIN index after the bulk load, with the same
+    exists / invalid-leftover handling as build_index.
+    Returns {"status", "seconds"}.
+    """
+    status = await metadata_index_status()
+    if status is not None and status["valid"]:
+        return {"status": "exists"}
+
+    conn = await _autocommit_connection()
+    try:
+        if status is not None:
+            await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {METADATA_INDEX}"))
+
+        await _configure_build(conn, settings.INDEX_MAINTENANCE_WORK_MEM)
+        try:
+            start = time.perf_counter()
+            await conn.execute(text(
+                f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}{METADATA_INDEX} "
+                f"ON {TABLE} USING gin (metadata jsonb_path_ops)"
+            ))
+            seconds = time.perf_counter() - start
+        finally:
+            await _reset_build(conn)
+        return {"status": "built", "seconds": seconds}
+    finally:
+        await conn.close()
+
+async def drop_index(quantization: Optional[str] = None):
+    """Drops the HNSW index, e.g. before a large bulk load."""
+    name = HNSW_INDEXES[quantization or settings.VECTOR_QUANTIZATION][0]
+    conn = await _autocommit_connection()
+    try:
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    finally:
+        await conn.close()
+
+async def migrate_metadata_to_jsonb():
+    """
+    One-off upgrade for databases created while 'metadata' was plain JSON:
+    converts the column to JSONB and builds its GIN index.
+    Note: ALTER COLUMN TYPE rewrites the table (and its indexes) under an
+    exclusive lock, so run it in a maintenance window.
+    """
+    conn = await _autocommit_connection()
+    try:
+        result = await conn.execute(text("""
+            SELECT data_type FROM information_schema.columns
+            WHERE table_name = :table AND column_name = 'metadata'
+        """), {"table": TABLE})
+        if result.scalar() == "json":
+            await conn.execute(text(
+                f"ALTER TABLE {TABLE} ALTER COLUMN metadata TYPE jsonb USING metadata::jsonb"
+            ))
+    finally:
+        await conn.close()
+
+    await build_metadata_index(concurrently=True)
+    await analyze()
@@ -28,7 +28,9 @@ async def init_db():
         # and runs them instantly.
         await conn.run_sync(Base.metadata.create_all)
     
-    print("✅ Database initialized! Tables created with HNSW support.")
+    # NOTE: The HNSW index is not created here. Building it once after the
+    # bulk load is much faster than inserting rows into a live index.
+    print("✅ Database initialized! Load data, then run 'cli/manage_index.py build'.")
 
 # 5. THE START BUTTON
 if __name__ == "__main__":
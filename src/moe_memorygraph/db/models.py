@@ -2,9 +2,13 @@ import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import String, DateTime, func, JSON, Float, Text, Index
+from sqlalchemy import String, DateTime, func, Float, Text, cast
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import Vector, HALFVEC, BIT
+
+# Embedding size of all-MiniLM-L6-v2
+EMBEDDING_DIM = 384
 
 # 1. Base Class for all models
 class Base(DeclarativeBase):
@@ -25,26 +29,45 @@ class VectorMemory(Base):
     # The raw text content
     content: Mapped[str] = mapped_column(Text, nullable=False)
     
-    # Metadata for filtering
-    metadata_: Mapped[Dict[str, Any]] = mapped_column("metadata", JSON, default={})
+    # Metadata for filtering (JSONB so it can be GIN-indexed)
+    metadata_: Mapped[Dict[str, Any]] = mapped_column("metadata", JSONB, default={})
     
     # The Embedding Vector (384 dimensions for MiniLM-L6-v2)
-    embedding: Mapped[List[float]] = mapped_column(Vector(384))
+    embedding: Mapped[List[float]] = mapped_column(Vector(EMBEDDING_DIM))
     
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
 
-    # --- Database 'Search Engine' Configuration ---
-    __table_args__ = (
-        Index(
-            "ix_vector_memory_embedding", 
-            "embedding", 
-            postgresql_using="hnsw", 
-            postgresql_with={"m": 16, "ef_construction": 64}, 
-            postgresql_ops={"embedding": "vector_cosine_ops"}, 
-        ),
-    )
+
+# --- Database 'Search Engine' Configuration ---
+# The HNSW and metadata GIN indexes are NOT part of the table definition, so
+# 'create_all' leaves them out. Building them once after a bulk load is far
+# faster than updating them row by row; see db/indexes.py and cli/manage_index.py.
+# The quantized variants are expression indexes: the table keeps the
+# full-precision vector (used for the exact rerank), while the index
+# stores the compact copy that dominates RAM.
+def halfvec_embedding():
+    """The embedding cast to half precision (2 bytes/dim)."""
+    return cast(VectorMemory.embedding, HALFVEC(EMBEDDING_DIM))
+
+def binary_embedding():
+    """The embedding binary-quantized to one bit per dimension."""
+    return cast(func.binary_quantize(VectorMemory.embedding), BIT(EMBEDDING_DIM))
+
+def full_embedding():
+    """The full-precision embedding column (4 bytes/dim)."""
+    return VectorMemory.embedding
+
+# quantization -> (index name, indexed expression, operator class)
+# The expression helpers are shared with experts/vector.py: the index DDL is
+# compiled from the SAME expression the search orders by, so the planner can
+# always match the expression index.
+HNSW_INDEXES = {
+    "none": ("ix_vector_memory_embedding", full_embedding, "vector_cosine_ops"),
+    "halfvec": ("ix_vector_memory_embedding_halfvec", halfvec_embedding, "halfvec_cosine_ops"),
+    "binary": ("ix_vector_memory_embedding_bit", binary_embedding, "bit_hamming_ops"),
+}
 
 # 3. Semantic Plane (Structured Facts)
 class SemanticFact(Base):
@@ -1,35 +1,147 @@
-from sqlalchemy import select
+from typing import Any, Dict, Optional
+from sqlalchemy import select, text, cast, func
+from pgvector.sqlalchemy import Vector, BIT
+from src.moe_memorygraph.core.config import settings
 from src.moe_memorygraph.db.session import async_session_factory
-from src.moe_memorygraph.db.models import VectorMemory
+from src.moe_memorygraph.db.models import (
+    VectorMemory, EMBEDDING_DIM, halfvec_embedding, binary_embedding
+)
 from src.moe_memorygraph.core.embedding import embed_text
 
-# THIS IS THE FUNCTION PYTHON IS LOOKING FOR
-async def search_vector_memory(query: str, limit: int = 5, tenant_id: str = "default"):
+# pgvector's default hnsw.ef_search. An HNSW scan never returns more than
+# ef_search candidates, so the over-fetch always sets it explicitly rather
+# than trusting whatever the server is configured with.
+DEFAULT_EF_SEARCH = 40
+# pgvector rejects hnsw.ef_search above this. Larger over-fetches still get
+# all their candidates, since iterative scans continue past ef_search.
+MAX_EF_SEARCH = 1000
+
+def _quantized_distance(query_vector: list[float], quantization: str):
     """
-    Expert: Performs semantic similarity search using pgvector.
+    Distance expression matching the HNSW index for the given quantization,
+    so the planner can use that index for the over-fetch stage.
     """
-    # 1. Convert text query to vector (embedding)
-    #    (This will use the GPU since your logs show CUDA is active)
-    query_vector = await embed_text(query)
+    if quantization == "halfvec":
+        return halfvec_embedding().cosine_distance(query_vector)
+    query_bits = cast(
+        func.binary_quantize(cast(query_vector, Vector(EMBEDDING_DIM))), BIT(EMBEDDING_DIM)
+    )
+    return binary_embedding().hamming_distance(query_bits)
+
+def _row_filters(tenant_id: str, metadata_filter: Optional[Dict[str, Any]]):
+    """
+    WHERE clauses for the search. The metadata filter becomes one JSONB
+    containment predicate (served by the GIN index): scalar values act as
+    equality ({"category": "REFUND"}), list/object values as containment
+    ({"tags": ["vip"]}).
+    """
+    filters = [VectorMemory.tenant_id == tenant_id]
+    if metadata_filter:
+        filters.append(VectorMemory.metadata_.contains(metadata_filter))
+    return filters
+
+async def search_by_embedding(
+    query_vector: list[float],
+    limit: int = 5,
+    tenant_id: str = "default",
+    quantization: Optional[str] = None,
+    rerank_factor: Optional[int] = None,
+    metadata_filter: Optional[Dict[str, Any]] = None,
+):
+    """
+    Nearest neighbours of an already-embedded query.
+
+    With quantization "none" this is a single HNSW search on the full-precision
+    vector. Otherwise it runs two stages:
+      1. Over-fetch `limit * rerank_factor` candidates from the compact
+         (halfvec / binary) index.
+      2. Rerank those candidates by exact cosine distance and keep `limit`.
+
+    `metadata_filter` is pushed into the SQL. HNSW applies every WHERE clause
+    (tenant_id included) AFTER the scan, so a selective filter could leave
+    fewer than `limit` rows; pgvector's iterative index scans keep scanning
+    until enough rows match.
+    """
+    quantization = quantization or settings.VECTOR_QUANTIZATION
+    if rerank_factor is None:
+        rerank_factor = settings.VECTOR_RERANK_FACTOR
+    if rerank_factor < 1:
+        raise ValueError(f"rerank_factor must be >= 1, got {rerank_factor}")
+    exact_distance = VectorMemory.embedding.cosine_distance(query_vector)
+    filters = _row_filters(tenant_id, metadata_filter)
 
     async with async_session_factory() as session:
-        # 2. Search DB (Cosine Distance)
-        #    Note: Ensure pgvector extension is enabled in your DB
-        stmt = select(VectorMemory).filter(
-            VectorMemory.tenant_id == tenant_id
-        ).order_by(
-            VectorMemory.embedding.cosine_distance(query_vector)
-        ).limit(limit)
+        # The quantized path re-sorts in the rerank stage, so it can use the
+        # cheaper relaxed ordering. (Requires pgvector >= 0.8.)
+        scan_order = "strict_order" if quantization == "none" else "relaxed_order"
+        await session.execute(text(f"SET LOCAL hnsw.iterative_scan = {scan_order}"))
 
-        result = await session.execute(stmt)
-        memories = result.scalars().all()
+        if quantization == "none":
+            stmt = select(VectorMemory, exact_distance.label("distance")).filter(
+                *filters
+            ).order_by(exact_distance).limit(limit)
+        else:
+            # Stage 1: fast, approximate over-fetch on the quantized index
+            num_candidates = limit * rerank_factor
+            # SET LOCAL only lasts for this session's transaction
+            ef_search = min(max(int(num_candidates), DEFAULT_EF_SEARCH), MAX_EF_SEARCH)
+            await session.execute(text(f"SET LOCAL hnsw.ef_search = {ef_search}"))
 
-        # 3. Format output
+            candidates = select(VectorMemory.id).filter(
+                *filters
+            ).order_by(
+                _quantized_distance(query_vector, quantization)
+            ).limit(num_candidates).subquery()
+
+            # Stage 2: exact cosine rerank of the candidates only
+            stmt = select(VectorMemory, exact_distance.label("distance")).join(
+                candidates, VectorMemory.id == candidates.c.id
+            ).order_by(exact_distance).limit(limit)
+
+        result = await session.execute(stmt)
         return [
             {
-                "content": m.content, 
-                "metadata": m.metadata_, 
-                "distance": "N/A" 
+                "id": str(m.id),
+                "content": m.content,
+                "metadata": m.metadata_,
+                "distance": float(distance)
             }
-            for m in memories
-        ]
\ No newline at end of file
+            for m, distance in result.all()
+        ]
+
+# THIS IS THE FUNCTION PYTHON IS LOOKING FOR
+async def search_vector_memory(
+    query: str,
+    limit: int = 5,
+    tenant_id: str = "default",
+    rerank_factor: Optional[int] = None,
+    metadata_filter: Optional[Dict[str, Any]] = None,
+):
+    """
+    Expert: Performs semantic similarity search using pgvector.
+
+    `rerank_factor` overrides settings.VECTOR_RERANK_FACTOR for quantized search.
+    `metadata_filter` (e.g. {"category": "REFUND"}) restricts the search in SQL.
+    Scoped hits always come first. Only if there are fewer than `limit` of them
+    is the rest filled with unfiltered hits (e.g. when the tenant's rows carry
+    no such metadata at all).
+    """
+    # 1. Convert text query to vector (embedding)
+    #    (This will use the GPU since your logs show CUDA is active)
+    query_vector = await embed_text(query)
+
+    # 2. Search DB (Cosine Distance, optionally via the quantized index)
+    #    Note: Ensure pgvector extension is enabled in your DB
+    results = await search_by_embedding(
+        query_vector, limit=limit, tenant_id=tenant_id,
+        rerank_factor=rerank_factor, metadata_filter=metadata_filter
+    )
+
+    # 3. Top-up: keep the scoped hits, pad with unfiltered ones (no duplicates)
+    if metadata_filter and len(results) < limit:
+        seen = {r["id"] for r in results}
+        fallback = await search_by_embedding(
+            query_vector, limit=limit, tenant_id=tenant_id, rerank_factor=rerank_factor
+        )
+        results += [r for r in fallback if r["id"] not in seen][:limit - len(results)]
+    return results
@@ -1,3 +1,4 @@
+from typing import Optional
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
@@ -8,6 +9,23 @@ from src.moe_memorygraph.graph.state import AgentState
 llm = ChatOpenAI(model=settings.OPENAI_MODEL, temperature=0)
 parser = JsonOutputParser()
 
+# Metadata vocabulary actually stored by ingestion/loader.py (Bitext dataset).
+# Anything outside it would match no rows, so it is never used as a filter.
+CATEGORIES = (
+    "ACCOUNT", "CANCEL", "CONTACT", "DELIVERY", "FEEDBACK", "INVOICE",
+    "ORDER", "PAYMENT", "REFUND", "SHIPPING", "SUBSCRIPTION",
+)
+INTENTS = (
+    "cancel_order", "change_order", "change_shipping_address", "check_cancellation_fee",
+    "check_invoice", "check_payment_methods", "check_refund_policy", "complaint",
+    "contact_customer_service", "contact_human_agent", "create_account", "delete_account",
+    "delivery_options", "delivery_period", "edit_account", "get_invoice", "get_refund",
+    "newsletter_subscription", "payment_issue", "place_order", "recover_password",
+    "registration_problems", "review", "set_up_shipping_address", "switch_account",
+    "track_order", "track_refund",
+)
+FILTER_VOCABULARY = {"category": CATEGORIES, "intent": INTENTS}
+
 SYSTEM_PROMPT = """
 You are the Router for a customer support brain. 
 Analyze the query and strictly select the necessary experts.
@@ -20,8 +38,28 @@ Return a valid JSON object with:
 1. "selected_experts": List[str]
 2. "rationale": str (Why you chose them)
 3. "confidence": float (0.0 to 1.0)
+4. "filters": object or null. ONLY when the query is clearly scoped to one ticket
+   "category" and/or "intent", using EXACTLY one of the values below. Otherwise null.
+   category: """ + ", ".join(CATEGORIES) + """
+   intent: """ + ", ".join(INTENTS) + """
 """
 
+def parse_filters(raw) -> Optional[dict]:
+    """
+    Keeps only known keys whose value is in the stored vocabulary; anything
+    else is dropped. Case is normalised first (category UPPER, intent lower).
+    """
+    if not isinstance(raw, dict):
+        return None
+    filters = {}
+    for key, value in raw.items():
+        if key not in FILTER_VOCABULARY or not isinstance(value, str):
+            continue
+        value = value.strip().upper() if key == "category" else value.strip().lower()
+        if value in FILTER_VOCABULARY[key]:
+            filters[key] = value
+    return filters or None
+
 # THIS IS THE FUNCTION PYTHON IS LOOKING FOR
 async def route_query(state: AgentState):
     prompt = ChatPromptTemplate.from_messages([
@@ -42,7 +80,8 @@ async def route_query(state: AgentState):
         return {
             "selected_experts": experts,
             "gate_rationale": decision.get("rationale", "Auto-selection"),
-            "gate_confidence": decision.get("confidence", 0.5)
+            "gate_confidence": decision.get("confidence", 0.5),
+            "metadata_filter": parse_filters(decision.get("filters"))
         }
         
     except Exception as e:
@@ -50,5 +89,6 @@ async def route_query(state: AgentState):
         return {
             "selected_experts": ["vector_search"],
             "gate_rationale": f"Router Error: {str(e)}",
-            "gate_confidence": 0.0
+            "gate_confidence": 0.0,
+            "metadata_filter": None
         }
\ No newline at end of file
@@ -7,7 +7,11 @@ from src.moe_memorygraph.graph.nodes.synthesize import synthesize_answer
 
 # Node Wrappers
 async def vector_node(state: AgentState):
-    results = await search_vector_memory(state["query"], tenant_id=state["tenant_id"])
+    results = await search_vector_memory(
+        state["query"],
+        tenant_id=state["tenant_id"],
+        metadata_filter=state.get("metadata_filter")
+    )
     return {"expert_results": [{"expert_name": "vector_search", "data": results}]}
 
 async def ltm_node(state: AgentState):
@@ -18,7 +22,11 @@ def route_to_experts(state: AgentState):
     routes = []
     for expert in state["selected_experts"]:
         if expert == "vector_search":
-            routes.append(Send("vector_expert", {"query": state["query"], "tenant_id": state["tenant_id"]}))
+            routes.append(Send("vector_expert", {
+                "query": state["query"],
+                "tenant_id": state["tenant_id"],
+                "metadata_filter": state.get("metadata_filter")
+            }))
         elif expert == "ltm_recall":
             routes.append(Send("ltm_expert", {"query": state["query"], "tenant_id": state["tenant_id"]}))
     return routes
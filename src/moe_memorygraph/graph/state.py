@@ -31,6 +31,9 @@ class AgentState(TypedDict):
     gate_rationale: Optional[str]
     # Confidence scores for the gate's decision
     gate_confidence: float
+    # Metadata scope extracted by the Gate (e.g., {"category": "REFUND"}),
+    # pushed into the vector expert's SQL. None means "search everything".
+    metadata_filter: Optional[Dict[str, Any]]
     
     # --- Result Accumulator (Crucial for Parallelism) ---
     # This is the most critical field for MoE.
@@ -6,6 +6,7 @@ from datasets import load_dataset
 from moe_memorygraph.db.session import AsyncSessionLocal
 from moe_memorygraph.db.models import VectorMemory
 from moe_memorygraph.core.embedding import embedder
+from src.moe_memorygraph.db.indexes import analyze
 
 async def ingest_local_csv(limit: int = 26872):
     """
@@ -89,6 +90,13 @@ async def ingest_local_csv(limit: int = 26872):
         await session.commit()
         print(f"✅ Successfully ingested {count} memories from LOCAL CSV!")
 
+    # LOGIC: Post-Load Maintenance
+    # ANALYZE refreshes the planner statistics for the new rows.
+    # The HNSW index is built separately, ONCE, over the loaded table
+    # (cli/manage_index.py build) instead of row by row during the load.
+    await analyze()
+    print("👉 Now build the vector index: python -m src.moe_memorygraph.cli.manage_index build")
+
 # SYNTAX: Entry Point
 # Since we are using 'async' functions, we need 'asyncio.run()' to start the event loop.
 if __name__ == "__main__":